@@ -0,0 +1,23 @@
+# cython: boundscheck=False, wraparound=False
+"""Cython NaN-fill kernel: one tight C loop instead of Python-level dispatch.
+
+Build in place with: python setup.py build_ext --inplace
+The strategies fall back to NumPy when the extension is not built.
+"""
+from libc.math cimport isnan
+
+
+ctypedef fused floating:
+    float
+    double
+
+
+def nan_fill_2d(floating[::1, :] data, floating[:] fills):
+    """Fills NaNs in F-contiguous data with the per-column fill values in-place"""
+    cdef Py_ssize_t i, j
+    # column-outer, row-inner: unit-stride over each F-contiguous column,
+    # which the C compiler auto-vectorizes into compare+blend SIMD loops
+    for j in range(data.shape[1]):
+        for i in range(data.shape[0]):
+            if isnan(data[i, j]):
+                data[i, j] = fills[j]
@@ -0,0 +1,158 @@
+"""Optional Numba-compiled imputation kernels.
+
+The *_impute_inplace kernels fuse the per-column statistic and the NaN fill
+into a single parallel pass over the data and return the fitted per-column
+values; fill_nans_inplace applies pre-computed fills, one column per thread.
+When numba is not installed the kernel names are None and the strategies
+fall back to their plain NumPy implementations.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Below this element count the ~us-level kernel call overhead is not worth it
+NUMBA_MIN_SIZE = 10_000
+
+
+if NUMBA_AVAILABLE:
+    # fastmath is deliberately left off: it lets LLVM assume no NaNs exist,
+    # which would break the isnan tests these kernels are built around.
+
+    # Explicit signatures compile the hot fill kernel at import time, and
+    # cache=True persists the machine code on disk, so a short-running
+    # script pays no JIT tax on its first transform. The contiguity
+    # annotations let Numba emit unit-stride SIMD loads with no runtime
+    # stride checks: F-order matches Imputer's storage, C-order matches the
+    # transposed axis=1 view. The fused *_impute_inplace kernels stay lazy;
+    # they only fire on large arrays where one compile is amortized anyway.
+    _FILL_SIGNATURES = [
+        "void(float64[::1, :], float64[:])",
+        "void(float32[::1, :], float32[:])",
+        "void(float64[:, ::1], float64[:])",
+        "void(float32[:, ::1], float32[:])",
+    ]
+
+    @njit(_FILL_SIGNATURES, parallel=True, cache=True, nogil=True)
+    def fill_nans_inplace(data, fills):
+        """Fills NaNs with the per-column fill values, columns across threads"""
+        for j in prange(data.shape[1]):
+            for i in range(data.shape[0]):
+                if np.isnan(data[i, j]):
+                    data[i, j] = fills[j]
+
+    @njit(parallel=True, cache=True)
+    def mean_impute_inplace(data):
+        out = np.empty(data.shape[1], dtype=data.dtype)
+        for j in prange(data.shape[1]):
+            s = 0.0
+            n = 0
+            for i in range(data.shape[0]):
+                v = data[i, j]
+                if not np.isnan(v):
+                    s += v
+                    n += 1
+            if n == 0:
+                out[j] = np.nan
+                continue
+            fill = s / n
+            out[j] = fill
+            for i in range(data.shape[0]):
+                if np.isnan(data[i, j]):
+                    data[i, j] = fill
+        return out
+
+    @njit(cache=True)
+    def _select_kth(buf, k):
+        """Quickselect: returns the k-th smallest element, partially ordering buf"""
+        lo = 0
+        hi = buf.shape[0] - 1
+        while lo < hi:
+            pivot = buf[(lo + hi) // 2]
+            i = lo
+            j = hi
+            while i <= j:
+                while buf[i] < pivot:
+                    i += 1
+                while buf[j] > pivot:
+                    j -= 1
+                if i <= j:
+                    buf[i], buf[j] = buf[j], buf[i]
+                    i += 1
+                    j -= 1
+            if k <= j:
+                hi = j
+            elif k >= i:
+                lo = i
+            else:
+                break
+        return buf[k]
+
+    @njit(parallel=True, cache=True)
+    def median_impute_inplace(data):
+        # np.median under @njit mishandles NaNs, so the NaN filter and the
+        # selection are done by hand on a per-thread scratch buffer.
+        out = np.empty(data.shape[1], dtype=data.dtype)
+        for j in prange(data.shape[1]):
+            buf = np.empty(data.shape[0], dtype=data.dtype)
+            n = 0
+            for i in range(data.shape[0]):
+                v = data[i, j]
+                if not np.isnan(v):
+                    buf[n] = v
+                    n += 1
+            if n == 0:
+                out[j] = np.nan
+                continue
+            k = n // 2
+            if n % 2 == 1:
+                fill = _select_kth(buf[:n], k)
+            else:
+                fill = 0.5 * (_select_kth(buf[:n], k) + _select_kth(buf[:n], k - 1))
+            out[j] = fill
+            for i in range(data.shape[0]):
+                if np.isnan(data[i, j]):
+                    data[i, j] = fill
+        return out
+
+    @njit(parallel=True, cache=True)
+    def mode_impute_inplace(data):
+        # A typed-dict count cannot live inside prange, so the mode is found
+        # by sorting the non-NaN values and scanning for the longest run.
+        out = np.empty(data.shape[1], dtype=data.dtype)
+        for j in prange(data.shape[1]):
+            buf = np.empty(data.shape[0], dtype=data.dtype)
+            n = 0
+            for i in range(data.shape[0]):
+                v = data[i, j]
+                if not np.isnan(v):
+                    buf[n] = v
+                    n += 1
+            if n == 0:
+                out[j] = np.nan
+                continue
+            b = np.sort(buf[:n])
+            fill = b[0]
+            best_count = 1
+            run_count = 1
+            for i in range(1, n):
+                if b[i] == b[i - 1]:
+                    run_count += 1
+                else:
+                    run_count = 1
+                if run_count > best_count:
+                    best_count = run_count
+                    fill = b[i]
+            out[j] = fill
+            for i in range(data.shape[0]):
+                if np.isnan(data[i, j]):
+                    data[i, j] = fill
+        return out
+else:
+    fill_nans_inplace = None
+    mean_impute_inplace = None
+    median_impute_inplace = None
+    mode_impute_inplace = None
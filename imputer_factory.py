@@ -1,107 +1,302 @@
-import enum
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 import numpy as np
 
+import _impute_numba
+from _impute_numba import NUMBA_MIN_SIZE
+
+try:
+    from _impute_cy import nan_fill_2d
+except ImportError:
+    nan_fill_2d = None
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
 
 class ImputerStrategy(ABC):
     """Imputer strategy user interface"""
-    def __init__(self, axis: int) -> None:
-        self.axis = axis
+    # Optional fused fit+fill kernel, set per concrete strategy (None without numba)
+    _numba_kernel = None
+
+    @classmethod
+    def for_axis(cls, axis: int) -> "ImputerStrategy":
+        """Specializes on the axis at construction time so the per-call hot
+        path carries no axis branch: axis=1 wraps the column-wise strategy
+        in a transposing adapter"""
+        if axis == 0:
+            return cls()
+        elif axis == 1:
+            return _TransposedStrategy(cls())
+        else:
+            raise RuntimeError(f"Unknown axis: {axis}.")
 
     """Each class will provide its implementation using these methods bellow"""
     @abstractmethod
-    def fit(self, data: np.ndarray) -> np.ndarray:
+    def fit(self, data: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
         pass
 
-    @abstractmethod
-    def transform(self, data: np.ndarray, fitted_data: np.ndarray) -> np.ndarray:
-        pass
+    def transform(self, data: np.ndarray, fitted_data: np.ndarray,
+                  mask: np.ndarray = None) -> np.ndarray:
+        """Fills NaNs in-place with the fitted per-column values in one vectorized pass"""
+        fill_kernel = _impute_numba.fill_nans_inplace
+        if (fill_kernel is not None and data.size > NUMBA_MIN_SIZE
+                and data.dtype in (np.float32, np.float64)
+                and (data.flags.f_contiguous or data.flags.c_contiguous)):
+            # layout/dtype guard matches the kernel's precompiled signatures
+            fill_kernel(data, np.asarray(fitted_data, dtype=data.dtype))
+            return data
+        if (nan_fill_2d is not None and data.flags.f_contiguous
+                and fitted_data.dtype == data.dtype):
+            nan_fill_2d(data, fitted_data)
+            return data
+        if mask is None:
+            mask = np.isnan(data)
+        # write only the k NaN cells instead of a full-array masked pass;
+        # real tables are usually <10% missing, so k << data.size
+        rows, cols = np.nonzero(mask)
+        # take/put stay inside single C entry points instead of the
+        # Python-level fancy __getitem__/__setitem__ machinery; the flat
+        # indices are logical (row-major) whatever the memory layout
+        fills = np.take(fitted_data, cols)
+        np.put(data, rows * data.shape[1] + cols, fills)
+        return data
+
+    def fit_transform(self, data: np.ndarray, mask: np.ndarray = None) -> tuple:
+        """Fits and fills in one call; strategies may override to fuse the passes"""
+        kernel = self._numba_kernel
+        if kernel is not None and data.size > NUMBA_MIN_SIZE:
+            # fused statistic+fill: one parallel pass, no mask materialized
+            return kernel(data), data
+        if mask is None:
+            mask = np.isnan(data)
+        fitted_data = self.fit(data, mask)
+        return fitted_data, self.transform(data, fitted_data, mask)
 
 
 """These classes implement the calculation of the required tasks which is transform and fit"""
 class Mean(ImputerStrategy):
     """"Concrete Mean strategy"""
-    def __init__(self, axis: int = 0) -> None:
-        super(Mean, self).__init__(axis)
+    _numba_kernel = staticmethod(_impute_numba.mean_impute_inplace)
 
-    def fit(self, data: np.ndarray) -> np.ndarray:
-        if self.axis == 0:
-            return np.nanmean(data, axis=self.axis)
-        else:
-            print(f"`fit` method for axis={self.axis} is not implemented.")
+    def __init__(self) -> None:
+        self._sum_buf = None
 
-    def transform(self, data: np.ndarray, fitted_data: np.ndarray) -> np.ndarray:
-        if self.axis == 0:
-            for i in range(data.shape[1]):
-                d = data[:, i]
-                data[:, i] = np.nan_to_num(d, nan=fitted_data[i])
-            return data
-        else:
-            print(f"`transform` method for axis={self.axis} is not implemented.")
+    def fit(self, data: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        if mask is None:
+            # without a cached mask, bottleneck's single-pass C nanmean
+            # beats building one here
+            if bn is not None:
+                return bn.nanmean(data, axis=0)
+            mask = np.isnan(data)
+        valid = ~mask
+        counts = valid.sum(axis=0)
+        if (self._sum_buf is None or self._sum_buf.shape != (data.shape[1],)
+                or self._sum_buf.dtype != data.dtype):
+            self._sum_buf = np.empty(data.shape[1], dtype=data.dtype)
+        # where= skips the NaN lanes without materializing a masked copy
+        np.sum(data, axis=0, where=valid, out=self._sum_buf)
+        # the division allocates a fresh result, so the fitted values
+        # never alias the reused sum buffer
+        return self._sum_buf / counts.astype(data.dtype)
+
+    def fit_transform(self, data: np.ndarray, mask: np.ndarray = None) -> tuple:
+        """Single-pass mean imputation: one read of data plus the (small) mask"""
+        kernel = self._numba_kernel
+        if kernel is not None and data.size > NUMBA_MIN_SIZE:
+            return kernel(data), data
+        if mask is None:
+            mask = np.isnan(data)
+        means = self.fit(data, mask)
+        np.copyto(data, means, where=mask)
+        return means, data
 
 
 class Median(ImputerStrategy):
     """Concrete Median strategy"""
-    def __init__(self, axis: int = 0) -> None:
-        super(Median, self).__init__(axis=axis)
+    _numba_kernel = staticmethod(_impute_numba.median_impute_inplace)
 
-    def fit(self, data: np.ndarray) -> np.ndarray:
-        if self.axis == 0:
-            return np.nanmedian(data, axis=self.axis)
-        else:
-            print(f"`fit` method for axis={self.axis} is not implemented.")
-
-    def transform(self, data: np.ndarray, fitted_data: np.ndarray) -> np.ndarray:
-        if self.axis == 0:
-            for i in range(data.shape[1]):
-                d = data[:, i]
-                data[:, i] = np.nan_to_num(d, nan=fitted_data[i])
-            return data
+    def fit(self, data: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        if mask is None and bn is not None:
+            # bottleneck handles the NaN filter itself in a single C pass
+            return bn.nanmedian(data, axis=0)
+        if mask is None:
+            mask = np.isnan(data)
+        out = np.empty(data.shape[1], dtype=data.dtype)
+        for j in range(data.shape[1]):
+            col = data[~mask[:, j], j]
+            n = col.size
+            if n == 0:
+                out[j] = np.nan
+                continue
+            k = n // 2
+            # introselect partition is O(N), vs the full per-column sort
+            # nanmedian does internally
+            part = np.partition(col, k)
+            out[j] = part[k] if n & 1 else 0.5 * (part[k] + part[:k].max())
+        return out
 
 
 class Mode(ImputerStrategy):
     """Concrete Mode strategy"""
-    def __init__(self, axis: int = 0) -> None:
-        super(Mode, self).__init__(axis=axis)
+    _numba_kernel = staticmethod(_impute_numba.mode_impute_inplace)
 
-    def fit(self, data: np.ndarray) -> np.ndarray:
-        if self.axis == 0:
-            u, c = np.unique(data, axis=self.axis, return_counts=True)
-            return u[c.argmax()]
-        else:
-            print(f"`fit` method for axis={self.axis} is not implemented.")
+    def fit(self, data: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        if mask is None:
+            mask = np.isnan(data)
+        out = np.empty(data.shape[1], dtype=data.dtype)
+        for j in range(data.shape[1]):
+            col = data[~mask[:, j], j]
+            if col.size == 0:
+                out[j] = np.nan
+                continue
+            # integer-coded columns with a small value range take the
+            # O(N+K) counting-array route; np.bincount beats the sort
+            # inside np.unique there
+            if (col.min() >= 0 and col.max() < max(2 * col.size, 1024)
+                    and np.all(col == np.floor(col))):
+                out[j] = np.bincount(col.astype(np.int64)).argmax()
+            else:
+                u, c = np.unique(col, return_counts=True)
+                out[j] = u[c.argmax()]
+        return out
 
-    def transform(self, data: np.ndarray, fitted_data: np.ndarray) -> np.ndarray:
-        if self.axis == 0:
-            for i in range(data.shape[1]):
-                d = data[:, i]
-                data[:, i] = np.nan_to_num(d, nan=fitted_data[i])
-            return data
+
+class _TransposedStrategy(ImputerStrategy):
+    """Applies a column-wise strategy along axis=1 by working on the
+    transposed view; the fill still lands in the caller's array in-place"""
+    def __init__(self, strategy: ImputerStrategy) -> None:
+        self._strategy = strategy
+
+    def fit(self, data: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        return self._strategy.fit(data.T, None if mask is None else mask.T)
+
+    def transform(self, data: np.ndarray, fitted_data: np.ndarray,
+                  mask: np.ndarray = None) -> np.ndarray:
+        self._strategy.transform(data.T, fitted_data,
+                                 None if mask is None else mask.T)
+        return data
+
+    def fit_transform(self, data: np.ndarray, mask: np.ndarray = None) -> tuple:
+        fitted_data, _ = self._strategy.fit_transform(
+            data.T, None if mask is None else mask.T)
+        return fitted_data, data
 
 
 class Imputer:
-    def __init__(self, strategy: ImputerStrategy) -> None:
-        """The base class for imputer objects"""
+    def __init__(self, strategy: ImputerStrategy, dtype: np.dtype = np.float32,
+                 device: str = "cpu") -> None:
+        """The base class for imputer objects
+
+        dtype (optional): working precision. float32 halves the bytes touched
+        on this memory-bound pipeline; pass np.float64 for exact reductions
+        device (optional): "cpu" or "cuda". "cuda" runs the mean/median
+        pipeline on the GPU through CuPy and falls back to the CPU when
+        CuPy is not installed
+        """
+        self.dtype = dtype
+        self.device = device
+        self._xp = np
+        if device == "cuda":
+            try:
+                import cupy
+                self._xp = cupy
+            except ImportError:
+                self.device = "cpu"
         self._strategy = strategy
         self._data = None
         self._fitted_data = None
+        self._mask = None
+        self._has_nan = False
 
-    def fit(self, data: np.ndarray) -> "Imputer":
-        self._data = data.astype(float)
-        self._fitted_data = self._strategy.fit(self._data)
+    def fit(self, data: np.ndarray, copy: bool = False) -> "Imputer":
+        """Set copy=True to keep the caller's float array untouched by transform.
+        Data is held in Fortran order so each column is contiguous; the
+        transformed output is F-contiguous as well."""
+        if self._xp is not np:
+            return self._fit_cuda(data)
+        if copy:
+            self._data = np.array(data, dtype=self.dtype, order="F")
+        else:
+            self._data = np.asfortranarray(data, dtype=self.dtype)
+        self._update_mask()
+        self._has_nan = bool(self._mask.any())
+        if not self._has_nan:
+            # clean input: nothing to fit, transform will hand the data back
+            self._fitted_data = None
+            return self
+        self._fitted_data = self._strategy.fit(self._data, self._mask)
         return self
 
     def transform(self) -> np.ndarray:
-        return self._strategy.transform(self._data, self._fitted_data)
+        if self._xp is not np:
+            return self._transform_cuda()
+        if not self._has_nan:
+            return self._data
+        return self._strategy.transform(self._data, self._fitted_data, self._mask)
+
+    def fit_transform(self, data: np.ndarray, copy: bool = False) -> np.ndarray:
+        if self._xp is not np:
+            self._fit_cuda(data)
+            return self._transform_cuda()
+        if copy:
+            self._data = np.array(data, dtype=self.dtype, order="F")
+        else:
+            self._data = np.asfortranarray(data, dtype=self.dtype)
+        self._update_mask()
+        self._has_nan = bool(self._mask.any())
+        if not self._has_nan:
+            self._fitted_data = None
+            return self._data
+        self._fitted_data, transformed = self._strategy.fit_transform(self._data, self._mask)
+        return transformed
+
+    def _update_mask(self) -> None:
+        """Reuses the mask buffer across fits so repeat calls don't re-allocate"""
+        if self._mask is not None and self._mask.shape == self._data.shape:
+            np.isnan(self._data, out=self._mask)
+        else:
+            self._mask = np.isnan(self._data)
+
+    def _fit_cuda(self, data: np.ndarray) -> "Imputer":
+        """Same algorithm as fit, on GPU memory via CuPy"""
+        cp = self._xp
+        self._data = cp.asarray(data, dtype=self.dtype)
+        self._mask = cp.isnan(self._data)
+        self._has_nan = bool(self._mask.any())
+        if not self._has_nan:
+            self._fitted_data = None
+            return self
+        if isinstance(self._strategy, Mean):
+            self._fitted_data = cp.nanmean(self._data, axis=0)
+        elif isinstance(self._strategy, Median):
+            self._fitted_data = cp.nanmedian(self._data, axis=0)
+        else:
+            raise RuntimeError("mode strategy is not supported on device='cuda'.")
+        return self
+
+    def _transform_cuda(self) -> np.ndarray:
+        """Masked fill on the GPU; copies the result back to host memory"""
+        cp = self._xp
+        if not self._has_nan:
+            return cp.asnumpy(self._data)
+        self._data[self._mask] = cp.broadcast_to(
+            self._fitted_data, self._data.shape)[self._mask]
+        return cp.asnumpy(self._data)
+
+
+"""Keeps track of valid and available imputer strategies."""
+_STRATEGIES = {"mean": Mean, "median": Median, "mode": Mode}
 
 
-class Strategy(enum.Enum):
-    """Keeps track of valid and available imputer strategies."""
-    mean = "mean"
-    median = "median"
-    mode = "mode"
-    unknown = "unknown"
+@lru_cache(maxsize=None)
+def _cached_strategy(cls, axis: int) -> ImputerStrategy:
+    """Flyweight: strategies keep no per-fit state (fitted results are
+    freshly allocated), so one instance per (class, axis) pair is enough"""
+    return cls.for_axis(axis)
 
 
 def create_imputer_strategy(strategy: str, axis: int = 0) -> ImputerStrategy:
@@ -114,20 +309,10 @@ def create_imputer_strategy(strategy: str, axis: int = 0) -> ImputerStrategy:
     Returns:
         An instance of imputer strategy (Mean, Median, Mode)
     """
-    try:
-        strategy = Strategy(strategy)
-    except ValueError:
-        strategy = Strategy.unknown
-
-    if strategy is Strategy.unknown:
-        raise RuntimeError("Unknown strategy")
-
-    if strategy is Strategy.mean:
-        return Mean(axis=axis)
-    elif strategy is Strategy.median:
-        return Median(axis=axis)
-    else:
-        return Mode(axis=axis)
+    cls = _STRATEGIES.get(strategy)
+    if cls is None:
+        raise RuntimeError(f"Unknown strategy: {strategy}.")
+    return _cached_strategy(cls, axis)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,13 @@
+"""Builds the optional Cython NaN-fill extension: python setup.py build_ext --inplace"""
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+extensions = [
+    Extension(
+        "_impute_cy",
+        ["_impute_cy.pyx"],
+        extra_compile_args=["-O3", "-march=native"],
+    ),
+]
+
+setup(ext_modules=cythonize(extensions))